@@ -17,26 +17,146 @@ Serial Configuration:
 - Parity: None
 """
 
+import asyncio
+import functools
 import serial
+import os
 import time
 import logging
+import logging.handlers
+import queue
+import select
+import struct
 import sys
+import termios
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that reuses the formatted timestamp within the same second"""
+    
+    def __init__(self, fmt: Optional[str] = None, datefmt: Optional[str] = None):
+        super().__init__(fmt, datefmt)
+        self._last_sec: Optional[int] = None
+        self._last_str = ""
+    
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        # Without datefmt the default format includes milliseconds
+        if not datefmt:
+            return super().formatTime(record, datefmt)
+        
+        sec = int(record.created)
+        if sec != self._last_sec:
+            self._last_str = super().formatTime(record, datefmt)
+            self._last_sec = sec
+        return self._last_str
+
+
+# Frame header (magic, src, dst, ctrl, func, data length) and trailing checksum
+FRAME_HEADER = b"\xaa\x55"
+_HEADER_STRUCT = struct.Struct(">2sBBBBB")
+_CHECKSUM_STRUCT = struct.Struct(">H")
+
+
+def frame_checksum(body) -> int:
+    """
+    Compute the Goodwe frame checksum: 16-bit sum of all bytes
+    
+    Args:
+        body: Frame bytes preceding the checksum (bytes or memoryview)
+        
+    Returns:
+        Checksum value
+    """
+    return sum(body) & 0xFFFF
+
+
+@functools.lru_cache(maxsize=None)
+def make_alloc_packet(serial_number: bytes, address: int = 0x11) -> bytes:
+    """
+    Build an Allocate Register Address packet for an inverter serial number
+    
+    Packets are cached per (serial_number, address), so repeated sends reuse
+    the same bytes object instead of reassembling it.
+    
+    Args:
+        serial_number: 16-byte ASCII serial number of the inverter
+        address: Bus address to allocate (default: 0x11)
+        
+    Returns:
+        Complete frame including checksum
+    """
+    if len(serial_number) != 16:
+        raise ValueError(f"Serial number must be 16 bytes, got {len(serial_number)}")
+    
+    data = serial_number + bytes((address,))
+    body = _HEADER_STRUCT.pack(FRAME_HEADER, 0x80, 0x7F, 0x00, 0x01, len(data)) + data
+    return body + _CHECKSUM_STRUCT.pack(frame_checksum(body))
 
 
 class RS485Tester:
     """RS485 communication tester for Goodwe inverter"""
     
-    # Test packet definitions
-    OFFLINE_QUERY_PACKET = bytes.fromhex("aa55807f00000001fe")
-    REMOVE_REGISTER_PACKET = bytes.fromhex("aa55807f0002000200")
+    __slots__ = (
+        "port", "baudrate", "log_file", "serial_conn", "logger",
+        "_fd", "_silent_interval", "_last_send", "_bus_lock", "_io_executor",
+        "_response_timeout", "_inter_byte_timeout", "_file_buffer", "_log_listener",
+        "_log_listener_running", "_console_quiet",
+    )
+    
+    # Test packet definitions (fixed packets are byte literals, stored directly in the .pyc)
+    OFFLINE_QUERY_PACKET = b"\xaa\x55\x80\x7f\x00\x00\x00\x01\xfe"
+    OFFLINE_QUERY_HEX = "aa55807f00000001fe"
+    REMOVE_REGISTER_PACKET = b"\xaa\x55\x80\x7f\x00\x02\x00\x02\x00"
+    REMOVE_REGISTER_HEX = "aa55807f0002000200"
     # New Test Packet Definitions, aa55807f0000 changed to aa5580110001, where 01 is allocate register
-    ALLOCATE_REGISTER_ADDRESS_PACKET = bytes.fromhex("aa55807f000111313330303053535531323530303039381105a9")
-    READ_DATA_PACKET = bytes.fromhex("aa5580110101000192")
+    # Built once at class creation and reused for every transmission
+    INVERTER_SERIAL = b"13000SSU12500098"
+    ALLOCATE_REGISTER_ADDRESS_PACKET = make_alloc_packet(INVERTER_SERIAL)
+    ALLOCATE_REGISTER_ADDRESS_HEX = "aa55807f000111313330303053535531323530303039381105a9"
+    assert ALLOCATE_REGISTER_ADDRESS_PACKET.hex() == ALLOCATE_REGISTER_ADDRESS_HEX, \
+        "ALLOCATE_REGISTER_ADDRESS_HEX is out of date with make_alloc_packet()"
+    READ_DATA_PACKET = b"\xaa\x55\x80\x11\x01\x01\x00\x01\x92"
+    READ_DATA_HEX = "aa5580110101000192"
+    
+    # Hex strings for logging, looked up instead of computed per transmission
+    _PACKET_HEX = {
+        OFFLINE_QUERY_PACKET: OFFLINE_QUERY_HEX,
+        REMOVE_REGISTER_PACKET: REMOVE_REGISTER_HEX,
+        ALLOCATE_REGISTER_ADDRESS_PACKET: ALLOCATE_REGISTER_ADDRESS_HEX,
+        READ_DATA_PACKET: READ_DATA_HEX,
+    }
+    
+    # Test sequence: (packet, packet name, phase title)
+    PHASES = (
+        (OFFLINE_QUERY_PACKET, "Off-line Query", "Off-line Query Data Test"),
+        (REMOVE_REGISTER_PACKET, "Remove Register", "Remove Register Data Test"),
+        (OFFLINE_QUERY_PACKET, "Off-line Query (Repeated)",
+         "Off-line Query Data Test (Repeated)"),
+        (ALLOCATE_REGISTER_ADDRESS_PACKET, "Allocate Register Address",
+         "Allocate Register Address Test"),
+        (READ_DATA_PACKET, "Read Data", "Read Data Test"),
+    )
+    PHASE_COUNT = 5
+    PHASE_INTERVAL = 2.0
+    
+    # Frame layout: aa 55 | src | dst | ctrl | func | len | data... | checksum (2)
+    FRAME_HEADER = FRAME_HEADER
+    HEADER_LEN = 7
+    CHECKSUM_LEN = 2
+    MAX_FRAME_LEN = HEADER_LEN + 0xFF + CHECKSUM_LEN
+    
+    # Worst-case time for the inverter to start answering (seconds)
+    RESPONSE_LATENCY = 0.5
+    
+    # USB-serial latency timer with and without low latency mode (seconds)
+    USB_LATENCY_LOW = 0.001
+    USB_LATENCY_DEFAULT = 0.016
     
     def __init__(self, port: str = "/dev/ttyUSB0", baudrate: int = 9600,
-                 log_file: str = "rs485_test.log"):
+                 log_file: str = "rs485_test.log", show_port: bool = False):
         """
         Initialize RS485 tester
         
@@ -44,28 +164,59 @@ class RS485Tester:
             port: Serial port path (default: /dev/ttyUSB0)
             baudrate: Communication speed (default: 9600)
             log_file: Path to log file (default: rs485_test.log)
+            show_port: Name the port on every console line, for runs that
+                test several ports at once (default: False)
         """
         self.port = port
         self.baudrate = baudrate
         self.log_file = log_file
         self.serial_conn: Optional[serial.Serial] = None
+        self._fd: Optional[int] = None
+        
+        # Silent interval: 3.5 character times (10 bits each at 8N1)
+        self._silent_interval = 3.5 * 10 / baudrate
+        self._last_send = 0.0
+        
+        # Serializes access to the bus; created on first use inside the event loop
+        self._bus_lock: Optional[asyncio.Lock] = None
+        
+        # Dedicated thread for blocking serial I/O on this port; created on
+        # connect and shut down on disconnect
+        self._io_executor: Optional[ThreadPoolExecutor] = None
+        
+        # Read timeout: silent interval plus device latency
+        self._response_timeout = self._silent_interval + self.RESPONSE_LATENCY
+        
+        # Longest gap between bytes of one frame; updated on connect
+        self._inter_byte_timeout = self._silent_interval + self.USB_LATENCY_DEFAULT
         
         # Setup logging
-        self._setup_logging()
+        self._setup_logging(show_port)
         
-    def _setup_logging(self):
-        """Configure logging to both file and console"""
+    def _setup_logging(self, show_port: bool = False):
+        """
+        Configure logging to both file and console
+        
+        Args:
+            show_port: Include the logger name, which carries the port, in
+                console output
+        
+        Records are only enqueued on the calling thread; a background
+        QueueListener formats and writes them so disk and console I/O stay
+        out of the serial timing path.
+        """
         # Create logger
-        self.logger = logging.getLogger("RS485Tester")
+        self.logger = logging.getLogger(f"RS485Tester.{os.path.basename(self.port)}")
         self.logger.setLevel(logging.DEBUG)
         
         # Create formatters
-        detailed_formatter = logging.Formatter(
+        detailed_formatter = CachedTimeFormatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
-        console_formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s',
+        console_formatter = CachedTimeFormatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s' if show_port
+            else '%(asctime)s - %(levelname)s - %(message)s',
             datefmt='%H:%M:%S'
         )
         
@@ -74,15 +225,55 @@ class RS485Tester:
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(detailed_formatter)
         
+        # Batch file writes; WARNING and above are written out immediately
+        self._file_buffer = logging.handlers.MemoryHandler(
+            capacity=64,
+            flushLevel=logging.WARNING,
+            target=file_handler
+        )
+        self._file_buffer.setLevel(logging.DEBUG)
+        
+        # Console progress lines repeat the summary the file already has
+        self._file_buffer.addFilter(lambda record: not getattr(record, "progress", False))
+        
         # Console handler
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(logging.INFO)
         console_handler.setFormatter(console_formatter)
+        console_handler.addFilter(lambda record: getattr(record, "console", True))
         
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # Hand records to a listener thread that owns the real handlers.
+        # Console visibility is decided when a record is queued, not when the
+        # listener gets to it, so quiet mode applies to exactly the right lines.
+        self._console_quiet = False
+        log_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(self._mark_console)
+        self.logger.addHandler(queue_handler)
+        self._log_listener = logging.handlers.QueueListener(
+            log_queue,
+            self._file_buffer,
+            console_handler,
+            respect_handler_level=True
+        )
+        self._log_listener_running = False
+        self._start_log_listener()
+    
+    def _start_log_listener(self):
+        """Start the log listener thread unless it is already running"""
+        if not self._log_listener_running:
+            self._log_listener.start()
+            self._log_listener_running = True
         
+    def _mark_console(self, record: logging.LogRecord) -> bool:
+        """Tag a record with whether it should reach the console"""
+        record.console = (
+            not self._console_quiet
+            or record.levelno >= logging.WARNING
+            or getattr(record, "progress", False)
+        )
+        return True
+    
     def connect(self) -> bool:
         """
         Establish serial connection to RS485 device
@@ -90,6 +281,14 @@ class RS485Tester:
         Returns:
             True if connection successful, False otherwise
         """
+        # A previous disconnect() stops the listener and I/O thread; bring them back
+        self._start_log_listener()
+        if self._io_executor is None:
+            self._io_executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix=f"rs485-{os.path.basename(self.port)}"
+            )
+        
         try:
             self.logger.info(f"Attempting to connect to {self.port}")
             self.logger.info(f"Configuration: {self.baudrate} baud, 8N1")
@@ -100,7 +299,7 @@ class RS485Tester:
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
-                timeout=2.0,
+                timeout=self._response_timeout,
                 write_timeout=2.0
             )
             
@@ -108,6 +307,12 @@ class RS485Tester:
             self.serial_conn.reset_input_buffer()
             self.serial_conn.reset_output_buffer()
             
+            # pyserial only configures the port; transactions use the fd directly
+            self._fd = self.serial_conn.fileno()
+            
+            if self._enable_low_latency():
+                self._inter_byte_timeout = self._silent_interval + self.USB_LATENCY_LOW
+            
             self.logger.info(f"Successfully connected to {self.port}")
             return True
             
@@ -118,19 +323,192 @@ class RS485Tester:
             self.logger.error(f"Unexpected error during connection: {e}")
             return False
     
+    def _enable_low_latency(self) -> bool:
+        """
+        Drop the FTDI latency timer from its 16 ms default to 1 ms
+        
+        Sets ASYNC_LOW_LATENCY on the port and falls back to the
+        usb-serial latency_timer sysfs attribute. Ports that support
+        neither are left unchanged.
+        
+        Returns:
+            True if low latency mode was enabled, False otherwise
+        """
+        try:
+            self.serial_conn.set_low_latency_mode(True)
+            self.logger.debug("Enabled ASYNC_LOW_LATENCY on serial port")
+            return True
+        except (AttributeError, ValueError) as e:
+            self.logger.debug(f"ASYNC_LOW_LATENCY not available: {e}")
+        
+        device = os.path.basename(os.path.realpath(self.port))
+        latency_timer = f"/sys/bus/usb-serial/devices/{device}/latency_timer"
+        try:
+            with open(latency_timer, "w") as f:
+                f.write("1")
+            self.logger.debug(f"Set {latency_timer} to 1 ms")
+            return True
+        except OSError as e:
+            self.logger.debug(f"Could not set FTDI latency timer: {e}")
+        
+        self.logger.warning("Low latency mode not available on this port")
+        return False
+    
     def disconnect(self):
-        """Close serial connection"""
+        """Close serial connection and flush pending log output"""
+        if self._io_executor is not None:
+            self._io_executor.shutdown(wait=True)
+            self._io_executor = None
         if self.serial_conn and self.serial_conn.is_open:
             self.serial_conn.close()
             self.logger.info("Serial connection closed")
+        self._fd = None
+        
+        # Drain queued log records before flushing the file buffer
+        if self._log_listener_running:
+            self._log_listener.stop()
+            self._log_listener_running = False
+        self._file_buffer.flush()
     
-    def send_packet(self, packet: bytes, packet_name: str) -> Tuple[bool, Optional[bytes]]:
+    def _frame_complete(self, buf: bytearray,
+                        response_len: Optional[int] = None) -> bool:
         """
-        Send a packet and read response
+        Check whether buf holds a whole response frame
+        
+        Bytes preceding the frame header are not counted.
+        
+        Args:
+            buf: Bytes received so far
+            response_len: Expected response size in bytes (default: taken
+                from the response header)
+            
+        Returns:
+            True if no more bytes are expected, False otherwise
+        """
+        start = buf.find(self.FRAME_HEADER)
+        if start < 0:
+            return False
+        
+        if response_len is not None:
+            return len(buf) - start >= response_len
+        
+        if len(buf) - start < self.HEADER_LEN:
+            return False
+        
+        data_len = self._parse_header(buf, start)[-1]
+        return len(buf) - start >= self.HEADER_LEN + data_len + self.CHECKSUM_LEN
+    
+    def _parse_header(self, buf, offset: int = 0) -> Tuple[bytes, int, int, int, int, int]:
+        """
+        Unpack a frame header without copying the buffer
+        
+        Args:
+            buf: bytes, bytearray or memoryview holding the frame
+            offset: Position of the header in buf
+            
+        Returns:
+            Tuple of (header, source, destination, control, function, data length)
+        """
+        return _HEADER_STRUCT.unpack_from(buf, offset)
+    
+    def _iter_frames(self, buf: bytes) -> Iterator[memoryview]:
+        """
+        Split back-to-back frames into zero-copy memoryview slices
+        
+        Args:
+            buf: Received bytes, starting at a frame header
+            
+        Yields:
+            One memoryview per complete frame; trailing partial data is ignored
+        """
+        mv = memoryview(buf)
+        offset = 0
+        while len(mv) - offset >= self.HEADER_LEN:
+            header, *_, data_len = self._parse_header(mv, offset)
+            if header != self.FRAME_HEADER:
+                return
+            end = offset + self.HEADER_LEN + data_len + self.CHECKSUM_LEN
+            if end > len(mv):
+                return
+            yield mv[offset:end]
+            offset = end
+    
+    def _checksum_ok(self, frame: memoryview) -> bool:
+        """
+        Check the trailing 16-bit checksum (sum of all preceding bytes)
+        
+        Args:
+            frame: A complete frame
+            
+        Returns:
+            True if the checksum matches, False otherwise
+        """
+        body_len = len(frame) - self.CHECKSUM_LEN
+        (checksum,) = _CHECKSUM_STRUCT.unpack_from(frame, body_len)
+        return frame_checksum(frame[:body_len]) == checksum
+    
+    def _read_frame(self, response_len: Optional[int] = None) -> Optional[bytes]:
+        """
+        Wait for a response with select() and read until the frame is complete
+        
+        Reading stops once the frame is complete, when no frame header has
+        arrived within the response timeout, or when the line stays idle for
+        longer than the inter-byte timeout after the header. Noise before the
+        header does not shorten the wait for the real frame.
+        
+        Args:
+            response_len: Expected response size in bytes (default: taken
+                from the response header)
+            
+        Returns:
+            Frame bytes (possibly truncated) or None if nothing was received
+        """
+        fd = self._fd
+        buf = bytearray()
+        deadline = time.monotonic() + self._response_timeout
+        in_frame = False
+        
+        while not self._frame_complete(buf, response_len):
+            if in_frame:
+                timeout = self._inter_byte_timeout
+            else:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+            
+            ready, _, _ = select.select([fd], [], [], timeout)
+            if not ready:
+                break
+            try:
+                chunk = os.read(fd, self.MAX_FRAME_LEN)
+            except BlockingIOError:
+                continue
+            if not chunk:
+                raise serial.SerialException(
+                    "device reports readiness to read but returned no data"
+                )
+            buf += chunk
+            in_frame = in_frame or buf.find(self.FRAME_HEADER) >= 0
+        
+        # Skip anything preceding the start of the frame
+        start = buf.find(self.FRAME_HEADER)
+        if start > 0:
+            del buf[:start]
+        
+        return bytes(buf) or None
+    
+    def _transact(self, packet: bytes, packet_name: str,
+                  response_len: Optional[int] = None,
+                  packet_hex: Optional[str] = None) -> Tuple[bool, Optional[bytes]]:
+        """
+        Send a packet and block until the response is read
         
         Args:
             packet: Bytes to send
             packet_name: Human-readable name for logging
+            response_len: Expected response size in bytes (default: taken
+                from the response header)
+            packet_hex: Precomputed hex string of packet for logging
             
         Returns:
             Tuple of (success: bool, response: Optional[bytes])
@@ -140,15 +518,24 @@ class RS485Tester:
             return False, None
         
         try:
-            # Convert packet to hex string for logging
-            packet_hex = packet.hex()
-            self.logger.debug(f"Sending {packet_name}: {packet_hex}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                if packet_hex is None:
+                    packet_hex = packet.hex()
+                self.logger.debug(f"Sending {packet_name}: {packet_hex}")
             
-            # Clear input buffer before sending
-            self.serial_conn.reset_input_buffer()
+            # Keep the bus quiet for the silent interval since the last send
+            wait = self._silent_interval - (time.monotonic() - self._last_send)
+            if wait > 0:
+                time.sleep(wait)
             
-            # Send packet
-            bytes_written = self.serial_conn.write(packet)
+            # Only discard input left over from a previous truncated frame
+            if self.serial_conn.in_waiting:
+                self.logger.debug("Discarding unexpected bytes in input buffer")
+                termios.tcflush(self._fd, termios.TCIFLUSH)
+            
+            # Send packet with a single write() syscall
+            bytes_written = os.write(self._fd, packet)
+            self._last_send = time.monotonic()
             
             if bytes_written != len(packet):
                 self.logger.error(
@@ -157,46 +544,90 @@ class RS485Tester:
                 )
                 return False, None
             
-            # Flush output to ensure data is sent
-            self.serial_conn.flush()
-            self.logger.debug(f"Successfully sent {bytes_written} bytes")
+            # Wait until the packet has been transmitted
+            termios.tcdrain(self._fd)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Successfully sent {bytes_written} bytes")
             
-            # Wait a bit for response
-            time.sleep(0.5)
+            # Block until the response arrives or the read timeout expires
+            response = self._read_frame(response_len)
             
-            # Read response if available
-            response = None
-            if self.serial_conn.in_waiting > 0:
-                response = self.serial_conn.read(self.serial_conn.in_waiting)
+            if response:
                 response_hex = response.hex()
                 self.logger.info(
                     f"Received response ({len(response)} bytes): {response_hex}"
                 )
+                for frame in self._iter_frames(response):
+                    if not self._checksum_ok(frame):
+                        self.logger.warning("Response frame failed checksum check")
             else:
                 self.logger.debug("No response received")
             
             return True, response
             
-        except serial.SerialTimeoutException:
-            self.logger.error("Timeout while sending packet")
-            return False, None
         except serial.SerialException as e:
             self.logger.error(f"Serial error while sending packet: {e}")
             return False, None
+        except (OSError, termios.error) as e:
+            self.logger.error(f"I/O error while sending packet: {e}")
+            return False, None
         except Exception as e:
             self.logger.error(f"Unexpected error while sending packet: {e}")
             return False, None
     
-    def send_packet_multiple_times(self, packet: bytes, packet_name: str,
-        count: int = 5, interval: float = 5.0) -> int:
+    async def send_packet(self, packet: bytes, packet_name: str,
+                          response_len: Optional[int] = None,
+                          packet_hex: Optional[str] = None) -> Tuple[bool, Optional[bytes]]:
+        """
+        Send a packet and read response
+        
+        The blocking serial transaction runs on this port's I/O thread so the
+        event loop stays free while waiting on the wire. Concurrent callers
+        on the same tester are serialized so only one transaction is on the
+        bus at a time.
+        
+        Args:
+            packet: Bytes to send
+            packet_name: Human-readable name for logging
+            response_len: Expected response size in bytes (default: taken
+                from the response header)
+            packet_hex: Precomputed hex string of packet for logging
+            
+        Returns:
+            Tuple of (success: bool, response: Optional[bytes])
+        """
+        if self._io_executor is None:
+            self.logger.error("Serial connection not established")
+            return False, None
+        
+        if self._bus_lock is None:
+            self._bus_lock = asyncio.Lock()
+        
+        loop = asyncio.get_running_loop()
+        async with self._bus_lock:
+            return await loop.run_in_executor(
+                self._io_executor, self._transact, packet, packet_name, response_len, packet_hex
+            )
+    
+    async def send_packet_multiple_times(self, packet: bytes, packet_name: str,
+        count: int = 5, interval: float = 5.0,
+        response_len: Optional[int] = None,
+        start: Optional[float] = None) -> int:
         """
         Send a packet multiple times with specified interval
         
+        Transmissions are scheduled against fixed deadlines measured from
+        start, so time spent waiting for responses does not add drift. A
+        transmission whose deadline has already passed is sent immediately.
+        
         Args:
             packet: Bytes to send
             packet_name: Human-readable name for logging
             count: Number of times to send (default: 5)
             interval: Seconds between sends (default: 5.0)
+            response_len: Expected response size in bytes (default: taken
+                from the response header)
+            start: Event loop time of the first transmission (default: now)
             
         Returns:
             Number of successful transmissions
@@ -204,23 +635,33 @@ class RS485Tester:
         self.logger.info(f"Starting {packet_name} test sequence")
         self.logger.info(f"Will send packet {count} times with {interval}s intervals")
         
+        packet_hex = self._PACKET_HEX.get(packet) or packet.hex()
         successful = 0
         
+        loop = asyncio.get_running_loop()
+        if start is None:
+            start = loop.time()
+        deadlines = [start + i * interval for i in range(count)]
+        
         for i in range(count):
+            # Wait for this transmission's deadline
+            delay = deadlines[i] - loop.time()
+            if delay > 0:
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug(f"Waiting {delay:.3f} seconds before next transmission")
+                await asyncio.sleep(delay)
+            
             self.logger.info(f"Transmission {i + 1}/{count}")
             
-            success, response = self.send_packet(packet, packet_name)
+            success, response = await self.send_packet(
+                packet, packet_name, response_len=response_len, packet_hex=packet_hex
+            )
             
             if success:
                 successful += 1
                 self.logger.info(f"✓ Transmission {i + 1} successful")
             else:
                 self.logger.warning(f"✗ Transmission {i + 1} failed")
-            
-            # Wait before next transmission (except after last one)
-            if i < count - 1:
-                self.logger.debug(f"Waiting {interval} seconds before next transmission")
-                time.sleep(interval)
         
         self.logger.info(
             f"Completed {packet_name} test sequence: "
@@ -229,109 +670,138 @@ class RS485Tester:
         
         return successful
     
-    def run_full_test(self) -> bool:
+    async def run_full_test(self) -> bool:
         """
-        Run the complete test sequence:
+        Run the complete test sequence, one phase per entry in PHASES:
         1. Send Off-line Query packet 5 times
         2. Send Remove Register packet 5 times
         3. Send Off-line Query packet 5 times again
+        4. Send Allocate Register Address packet 5 times
+        5. Send Read Data packet 5 times
+        
+        While the test runs the console only shows warnings, one line per
+        phase and a final summary line; full detail goes to the log file.
         
         Returns:
             True if all tests completed (regardless of success rate)
         """
+        self._console_quiet = True
         try:
             self.logger.info("=" * 60)
             self.logger.info("Starting RS485 Communication Test")
             self.logger.info(f"Test started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             self.logger.info("=" * 60)
             
-            # Phase 1: Off-line Query
-            self.logger.info("\n" + "=" * 60)
-            self.logger.info("PHASE 1: Off-line Query Data Test")
-            self.logger.info("=" * 60)
-            phase1_success = self.send_packet_multiple_times(
-                self.OFFLINE_QUERY_PACKET,
-                "Off-line Query",
-                count=5,
-                interval=2.0
-            )
-            
-            # Brief pause between phases
-            time.sleep(2)
-            
-            # Phase 2: Remove Register
-            self.logger.info("\n" + "=" * 60)
-            self.logger.info("PHASE 2: Remove Register Data Test")
-            self.logger.info("=" * 60)
-            phase2_success = self.send_packet_multiple_times(
-                self.REMOVE_REGISTER_PACKET,
-                "Remove Register",
-                count=5,
-                interval=2.0
-            )
-            
-            # Brief pause between phases
-            time.sleep(2)
-            
-            # Phase 3: Off-line Query (repeated)
-            self.logger.info("\n" + "=" * 60)
-            self.logger.info("PHASE 3: Off-line Query Data Test (Repeated)")
-            self.logger.info("=" * 60)
-            phase3_success = self.send_packet_multiple_times(
-                self.OFFLINE_QUERY_PACKET,
-                "Off-line Query (Repeated)",
-                count=5,
-                interval=2.0
-            )
+            # One absolute schedule for the whole run: transmissions are
+            # PHASE_INTERVAL apart, including from one phase to the next
+            loop = asyncio.get_running_loop()
+            t0 = loop.time()
+            slot = 0
             
-            # Brief pause between phases
-            time.sleep(2)
+            results = []
+            for i, (packet, packet_name, title) in enumerate(self.PHASES):
+                self.logger.info("\n" + "=" * 60)
+                self.logger.info(f"PHASE {i + 1}: {title}")
+                self.logger.info("=" * 60)
+                results.append(await self.send_packet_multiple_times(
+                    packet,
+                    packet_name,
+                    count=self.PHASE_COUNT,
+                    interval=self.PHASE_INTERVAL,
+                    start=t0 + slot * self.PHASE_INTERVAL
+                ))
+                self._log_progress(
+                    f"Phase {i + 1} ({packet_name}): "
+                    f"{results[-1]}/{self.PHASE_COUNT} successful"
+                )
+                slot += self.PHASE_COUNT
             
-            # Phase 4: Allocate Register Address Test
-            self.logger.info("\n" + "=" * 60)
-            self.logger.info("PHASE 4: Allocate Register Address Test")
-            self.logger.info("=" * 60)
-            phase4_success = self.send_packet_multiple_times(
-                self.ALLOCATE_REGISTER_ADDRESS_PACKET,
-                "Allocate Register Address",
-                count=5,
-                interval=2.0  # Update to 2-second intervals
-            )
-
-            time.sleep(2)
-
-            # Phase 5: Read Data Test
-            self.logger.info("\n" + "=" * 60)
-            self.logger.info("PHASE 5: Read Data Test")
-            self.logger.info("=" * 60)
-            phase5_success = self.send_packet_multiple_times(
-                self.READ_DATA_PACKET,
-                "Read Data",
-                count=5,
-                interval=2.0  # Update to 2-second intervals
-            )
-
-            # Update Summary
+            # Summary
+            total_count = self.PHASE_COUNT * len(self.PHASES)
             self.logger.info("\n" + "=" * 60)
             self.logger.info("TEST SUMMARY")
             self.logger.info("=" * 60)
-            self.logger.info(f"Phase 1 (Off-line Query):      {phase1_success}/5 successful")
-            self.logger.info(f"Phase 2 (Remove Register):     {phase2_success}/5 successful")
-            self.logger.info(f"Phase 3 (Off-line Query Rep.): {phase3_success}/5 successful")
-            self.logger.info(f"Phase 4 (Allocate Address):    {phase4_success}/5 successful")
-            self.logger.info(f"Phase 5 (Read Data):           {phase5_success}/5 successful")
-            self.logger.info(
-            f"Total: {phase1_success + phase2_success + phase3_success + phase4_success + phase5_success}/25 successful"
-                )
+            for i, ((_, packet_name, _), successful) in enumerate(zip(self.PHASES, results)):
+                label = f"Phase {i + 1} ({packet_name}):"
+                self.logger.info(f"{label:<40}{successful}/{self.PHASE_COUNT} successful")
+            self.logger.info(f"Total: {sum(results)}/{total_count} successful")
+            self._log_progress(
+                f"Total: {sum(results)}/{total_count} successful "
+                f"(details in {self.log_file})"
+            )
             
             return True
             
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, asyncio.CancelledError):
             self.logger.warning("\nTest interrupted by user")
             return False
         except Exception as e:
             self.logger.error(f"Unexpected error during test: {e}")
             return False
+        finally:
+            self._console_quiet = False
+    
+    def _log_progress(self, line: str):
+        """
+        Log a progress line that reaches the console even in quiet mode
+        
+        Goes through the log queue like every other record, so it stays in
+        order with the warnings logged before it.
+        """
+        self.logger.info(line, extra={"progress": True})
+
+
+async def run_testers(testers: List[RS485Tester]) -> List[bool]:
+    """
+    Run the full test on several testers concurrently
+    
+    Args:
+        testers: Connected testers, one per serial port
+        
+    Returns:
+        run_full_test result of each tester, in the same order
+    """
+    return await asyncio.gather(*(tester.run_full_test() for tester in testers))
+
+
+def port_log_file(log_file: str, port: str) -> str:
+    """
+    Derive a per-port log file path, e.g. rs485_test.log -> rs485_test_ttyUSB0.log
+    
+    Args:
+        log_file: Base log file path
+        port: Serial port path
+        
+    Returns:
+        Log file path for the given port
+    """
+    root, ext = os.path.splitext(log_file)
+    return f"{root}_{os.path.basename(port)}{ext}"
+
+
+def enable_realtime_scheduling(cpu: int = 3, priority: int = 20):
+    """
+    Pin the process to one CPU and switch it to SCHED_FIFO (Linux only)
+    
+    Keeps Home Assistant load from preempting the test inside the silent
+    interval and response window. Threads started afterwards inherit both
+    settings. Each step is skipped silently if unsupported or not permitted
+    (SCHED_FIFO needs CAP_SYS_NICE).
+    
+    Args:
+        cpu: CPU to pin to, if available to this process (default: 3)
+        priority: SCHED_FIFO priority (default: 20)
+    """
+    try:
+        if cpu in os.sched_getaffinity(0):
+            os.sched_setaffinity(0, {cpu})
+    except (AttributeError, OSError):
+        pass
+    
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except (AttributeError, OSError):
+        pass
 
 
 def main():
@@ -344,16 +814,19 @@ def main():
         epilog="""
 Examples:
   # Test with default settings (assumes /dev/ttyUSB0)
-  python3 rs485_test.py
+  python3 rs485_test_v2.py
   
   # Specify custom serial port
-  python3 rs485_test.py --port /dev/ttyUSB1
+  python3 rs485_test_v2.py --port /dev/ttyUSB1
+  
+  # Test two inverters concurrently (one log file per port)
+  python3 rs485_test_v2.py --port /dev/ttyUSB0 /dev/ttyUSB1
   
   # Change baud rate (not recommended - use 9600 for Goodwe)
-  python3 rs485_test.py --baudrate 19200
+  python3 rs485_test_v2.py --baudrate 19200
   
   # Specify custom log file
-  python3 rs485_test.py --log-file /var/log/rs485_test.log
+  python3 rs485_test_v2.py --log-file /var/log/rs485_test.log
 
 Note: Make sure you have proper permissions to access the serial port.
 You may need to add your user to the 'dialout' group or run with sudo.
@@ -362,8 +835,10 @@ You may need to add your user to the 'dialout' group or run with sudo.
     
     parser.add_argument(
         "--port", "-p",
-        default="/dev/ttyUSB0",
-        help="Serial port path (default: /dev/ttyUSB0)"
+        nargs="+",
+        default=["/dev/ttyUSB0"],
+        help="Serial port path(s); several ports are tested concurrently "
+             "(default: /dev/ttyUSB0)"
     )
     
     parser.add_argument(
@@ -376,22 +851,32 @@ You may need to add your user to the 'dialout' group or run with sudo.
     parser.add_argument(
         "--log-file", "-l",
         default="rs485_test.log",
-        help="Log file path (default: rs485_test.log)"
+        help="Log file path; suffixed with the port name when testing "
+             "several ports (default: rs485_test.log)"
     )
     
     args = parser.parse_args()
     
-    # Create tester instance
-    tester = RS485Tester(
-        port=args.port,
-        baudrate=args.baudrate,
-        log_file=args.log_file
-    )
+    enable_realtime_scheduling()
+    
+    # Create one tester instance per port
+    testers = [
+        RS485Tester(
+            port=port,
+            baudrate=args.baudrate,
+            log_file=port_log_file(args.log_file, port) if len(args.port) > 1 else args.log_file,
+            show_port=len(args.port) > 1
+        )
+        for port in args.port
+    ]
     
     try:
-        # Connect to serial port
-        if not tester.connect():
-            print(f"\nERROR: Failed to connect to {args.port}")
+        # Connect to serial ports
+        failed = [tester.port for tester in testers if not tester.connect()]
+        if failed:
+            for tester in testers:
+                tester.disconnect()
+            print(f"\nERROR: Failed to connect to {', '.join(failed)}")
             print("Please check:")
             print("  1. The device is connected")
             print("  2. The port path is correct")
@@ -400,15 +885,21 @@ You may need to add your user to the 'dialout' group or run with sudo.
             sys.exit(1)
         
         # Run the full test
-        success = tester.run_full_test()
+        try:
+            success = all(asyncio.run(run_testers(testers)))
+        except KeyboardInterrupt:
+            success = False
         
         # Disconnect
-        tester.disconnect()
+        for tester in testers:
+            tester.disconnect()
         
         # Exit with appropriate code
         sys.exit(0 if success else 1)
         
     except Exception as e:
+        for tester in testers:
+            tester.disconnect()
         print(f"\nFATAL ERROR: {e}")
         sys.exit(1)
 